@@ -20,6 +20,7 @@ from manager import (
     ClientSocketManager
 )
 from logger import logger
+from protocol import decode_json, recv_message
 from constants import is_windows, GREEN, GREY, YELLOW, BOLD, RESET 
 from datetime import datetime, timedelta
 from argparse import Namespace 
@@ -73,14 +74,14 @@ class Client:
 
                 if ready_to_read:
                     try:
-                        data = self.client_socket_manager.client_socket.recv(4096)
+                        data = recv_message(self.client_socket_manager.client_socket)
 
-                        if data.decode('utf-8').strip() == 'stop':
+                        if data == b'stop':
                             logger.info('Received stop signal, stopping connection handler')
                             self.event.set()
                             break
 
-                        if not data:
+                        if data is None:
                             logger.info('Connection closed by remote')
                             self.event.set()
                             break
@@ -117,15 +118,15 @@ class Client:
 
         json_data = {
             'command': 'add',
-            self.id: {
+            'id': self.id,
+            'process': {
                 'process_name': self.process_name,
                 'pid': self.process_pid,
                 'track_pid': os.getpid(),
                 'start_time': datetime.now().strftime('%Y/%m/%d %H:%M:%S'),
                 'session_time': time.time() if self.process_pid else None,
                 'runtime': 0.0,
-                'status': 'running' if self.process_pid else 'stopped',
-                'conn': None
+                'status': 'running' if self.process_pid else 'stopped'
             }
         }
 
@@ -228,7 +229,8 @@ class Client:
                     json_data = {
                         'command': 'update', 
                         'status': 'running', 
-                        process_info['name']: process_info['pid'],
+                        'process_name': process_info['name'],
+                        'pid': process_info['pid'],
                         'session_time': time.time()
                     }
                     self.queue.put(json_data)
@@ -246,7 +248,8 @@ class Client:
                 json_data = {
                     'command': 'update', 
                     'status': 'stopped', 
-                    self.process_name: None,
+                    'process_name': self.process_name,
+                    'pid': None,
                     'session_time': None
                 }
                 self.queue.put(json_data)
@@ -389,7 +392,7 @@ class Client:
         data = self.client_socket_manager.send_data({ 'command': 'status' })
 
         try: 
-            data = json.loads(data)
+            data = decode_json(data)
 
             ip = data.get('ip')
             port = data.get('port')
@@ -440,7 +443,7 @@ class Client:
         data = self.client_socket_manager.send_data({ 'command': args.command, 'all': args.all, 'detailed': args.detailed })
 
         try:
-            data = json.loads(data)
+            data = decode_json(data)
 
             headers = [f'{YELLOW}TRACK ID{RESET}', f'{YELLOW}PROCESS{RESET}', f'{YELLOW}STARTED{RESET}', f'{YELLOW}RUNTIME{RESET}', f'{YELLOW}STATUS{RESET}']
             if args.detailed:
@@ -505,8 +508,8 @@ class Client:
             if username is None:
                 raise Exception('Please create a user or switch to an existing user to perform')
             
-            start_flag = dateparser.parse(str(args.start))
-            end_flag = dateparser.parse(str(args.end))
+            start_flag = dateparser.parse(args.start) if args.start else datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            end_flag = dateparser.parse(args.end) if args.end else datetime.now()
 
             if start_flag is None or end_flag is None:
                 raise AttributeError
@@ -525,12 +528,14 @@ class Client:
         rows = []
         process_stats = {}
 
-        dates_list = []
-        curr_date = start_flag.date()
+        start_key = start_flag.strftime('%Y%m%d')
+        end_key = end_flag.strftime('%Y%m%d')
 
-        while curr_date <= end_flag.date():
-            dates_list.append(curr_date.strftime('%Y%m%d'))
-            curr_date += timedelta(days=1)
+        with os.scandir(logs_dir) as entries:
+            dates_list = sorted(
+                entry.name for entry in entries
+                if len(entry.name) == 8 and entry.name.isdigit() and start_key <= entry.name <= end_key
+            )
 
         for date in dates_list:
             log_file = os.path.join(logs_dir, date)
@@ -538,8 +543,8 @@ class Client:
 
             for process, time_info in data.items():
                 for info in time_info:
-                    start = max(datetime.fromisoformat(info['start_time']), start_flag)
-                    end = min(datetime.fromisoformat(info['end_time']), end_flag)
+                    start = max(datetime.fromisoformat(info.start_time), start_flag)
+                    end = min(datetime.fromisoformat(info.end_time), end_flag)
 
                     elapsed_time = end - start
 
@@ -563,7 +568,7 @@ class Client:
             data = self.client_socket_manager.send_data({'command': 'report'})
             
             try:
-                data = json.loads(data)
+                data = decode_json(data)
             except json.decoder.JSONDecodeError:
                 logger.error(f'There was a problem retrieving the active processes data, please try again')
                 sys.exit(1)
@@ -804,8 +809,8 @@ class Client:
         profile_data = self.profile_manager.get_profiles()
         
         for profile in profile_data:
-            username = f'{BOLD}{profile.get('username')}{RESET}'
-            if int(profile.get('selected')): 
+            username = f'{BOLD}{profile.username}{RESET}'
+            if profile.selected: 
                 username+=f' {GREEN}<={RESET} '
             print(username)
 
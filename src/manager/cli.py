@@ -1,17 +1,110 @@
 import argparse
+import functools
 import os
+import re
 import shutil
 import sys
 from pathlib import Path
-import subprocess
+from typing import TYPE_CHECKING, Callable, Optional
 from logger import logger
 from constants import is_windows, is_frozen, RED, YELLOW, GREY, BOLD, RESET
-from datetime import datetime, date
-from client import Client
-from daemonize import daemonize
-from server import Server
 from __version__ import __version__
 
+if TYPE_CHECKING:
+    from client import Client
+    from server import Server
+
+if is_windows:
+    import ctypes
+else:
+    import pwd
+
+_SERVER_SUBCOMMANDS = frozenset({'start', 'install', 'remove', 'enable', 'disable'})
+_ADMIN_CHECK = (lambda: ctypes.windll.shell32.IsUserAnAdmin() != 0) if is_windows else (lambda: os.getuid() == 0)
+
+_INVALID_CHOICE_RE = re.compile(r'choose from\s*[({]?([^)}]+)[)}]?')
+
+_COMMAND_HELP = {
+    'server': 'manage server',
+    'ls': 'list all processes',
+    'add': 'start tracking a process',
+    'rm': 'stop tracking a process',
+    'ps': 'show status of tracked processes',
+    'rename': 'rename tracking id of a process',
+    'report': 'show report',
+    'user': 'manage users',
+    'config': 'manage configuration',
+    'reset': 'reset program',
+}
+
+_ID_MIN_LENGTH = 3
+_ID_MAX_LENGTH = 24
+_ID_LENGTH_ERROR = f'id length must be between {_ID_MIN_LENGTH} and {_ID_MAX_LENGTH}'
+
+def _len_check(s: str) -> str:
+    '''
+    Validates that a tracking ID string length is between 3 and 24 characters.
+    Raises argparse.ArgumentTypeError if the check fails.
+    '''
+
+    if _ID_MIN_LENGTH <= len(s) <= _ID_MAX_LENGTH:
+        return s
+    raise argparse.ArgumentTypeError(_ID_LENGTH_ERROR)
+
+@functools.lru_cache(maxsize=1)
+def _service_paths() -> tuple[Path, str, Path, tuple[str, ...]]:
+    '''
+    Resolves the Windows service script: its directory, file name, full path and the command prefix that runs it.
+    Only the Windows service commands need it, so it is resolved on first use instead of at import, then cached.
+    '''
+
+    base_path = Path(sys.executable).parent if is_frozen else Path(__file__).resolve().parent.parent
+    service_name = 'service.exe' if is_frozen else 'service.py'
+    service_path = base_path / service_name
+    cmd_prefix = (str(service_path),) if is_frozen else (sys.executable, str(service_path))
+    return base_path, service_name, service_path, cmd_prefix
+
+@functools.lru_cache(maxsize=1)
+def _resolve_user(uid: int, euid: int, sudo_user: Optional[str], sudo_uid: Optional[str]) -> tuple[str, Path]:
+    '''
+    Resolves the username and home directory of the invoking user.
+    Prefers the original user when running under sudo.
+    Cached so repeated lookups do not hit NSS (LDAP/SSSD) again.
+    '''
+
+    if sudo_user and euid == 0:
+        try:
+            pw_entry = pwd.getpwuid(int(sudo_uid))
+            if pw_entry.pw_name == sudo_user:
+                return sudo_user, Path(pw_entry.pw_dir)
+        except (KeyError, ValueError, TypeError):
+            pass
+
+    try:
+        username = pwd.getpwuid(uid).pw_name
+        home = Path.home()
+    except Exception:
+        logger.error('An error occurred while retrieving current user information')
+        sys.exit(1)
+
+    return username, home
+
+def _create_client() -> 'Client':
+    '''
+    Default client factory, imports the client module on first use.
+    '''
+
+    from client import Client
+    return Client()
+
+def _create_server() -> 'Server':
+    '''
+    Default server factory, imports the server module on first use.
+    '''
+
+    from server import Server
+    return Server()
+
 class CliManager:
     '''
     Handles command-line interface parsing and 
@@ -24,35 +117,42 @@ class CliManager:
         '''
 
         def error(self, message: str) -> None:
-            if 'invalid choice' in message:
-                start_index = message.find('choose from') + len('choose from')
-                choices_part = message[start_index:].strip()
-                choices = choices_part.strip('()').split(', ')
-                available_commands = ', '.join(choices)
-                print(f'{RED}invalid command{RESET}\n{BOLD}Choose from:{RESET} {YELLOW}{available_commands}{RESET}')
+            m = _INVALID_CHOICE_RE.search(message)
+            if m:
+                choices = m.group(1).replace('\'', '').strip()
+                print(f'{RED}invalid command{RESET}\n{BOLD}Choose from:{RESET} {YELLOW}{choices}{RESET}')
             else:
                 logger.error(message)
             sys.exit(2) 
     
-    def __init__(self, client: Client, server: Server):
+    def __init__(
+        self,
+        client_factory: Callable[[], 'Client'] = _create_client,
+        server_factory: Callable[[], 'Server'] = _create_server
+    ):
         '''
-        Initializes the CLI manager with Client and Server instances.
+        Initializes the CLI manager with Client and Server factories.
+        The instances are only created when a command actually needs them.
         '''
 
-        self.client = client
-        self.server = server
+        self.client_factory = client_factory
+        self.server_factory = server_factory
 
-    def _len_check(self, s: str) -> str:
+    @functools.cached_property
+    def client(self) -> 'Client':
         '''
-        Validates that a tracking ID string length is between 3 and 24 characters.
-        Raises argparse.ArgumentTypeError if the check fails.
+        Client instance, created on first access.
         '''
 
-        min_length = 3
-        max_length = 24
-        if len(s) >= min_length and len(s) <= max_length:
-            return s
-        raise argparse.ArgumentTypeError(f'id length must be between {min_length} and {max_length}')
+        return self.client_factory()
+
+    @functools.cached_property
+    def server(self) -> 'Server':
+        '''
+        Server instance, created on first access.
+        '''
+
+        return self.server_factory()
 
     def create_parser(self) -> None:
         '''
@@ -61,15 +161,109 @@ class CliManager:
         It creates different sections for managing processes, users, server settings, configuration and more.
         '''
 
-        parser = self.CustomArgumentParser(
+        argv = sys.argv[1:]
+        if not argv:
+            self._print_banner()
+            return
+
+        if len(argv) == 1 and argv[0] in ('-v', '--version'):
+            print(f'v{__version__}')
+            sys.exit(0)
+
+        if len(argv) == 1 and argv[0] in ('-h', '--help'):
+            self._build_minimal_parser().parse_args()
+            return
+
+        command = argv[0] if argv else None
+        if command not in _COMMAND_HELP:
+            command = None
+
+        parser = self._build_parser_cached(command)
+        args = parser.parse_args()
+        self._arg_controller(args)
+    
+    @staticmethod
+    def _print_banner() -> None:
+        '''
+        Prints the welcome banner shown when no command is given.
+        '''
+
+        print(f'{BOLD}TRAKD v{__version__}{RESET} - {GREY}Keep track of process runtime{RESET}\nStart using with {YELLOW}\'trakd --help\'{RESET}')
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4)
+    def _build_parser_cached(command: Optional[str]) -> argparse.ArgumentParser:
+        '''
+        Builds the parser for the given top-level command, or for every command when None.
+        The result is cached, so repeated calls in the same process reuse the same parser.
+        '''
+
+        parser, subparsers = CliManager._build_root_parser()
+        builders = CliManager._parser_builders()
+
+        if command is not None:
+            builders[command](subparsers)
+        else:
+            for builder in builders.values():
+                builder(subparsers)
+
+        return parser
+
+    @staticmethod
+    def _build_root_parser() -> tuple[argparse.ArgumentParser, argparse._SubParsersAction]:
+        '''
+        Creates the top-level parser with its global options and 
+        returns it together with the subparsers action for registering commands.
+        '''
+
+        parser = CliManager.CustomArgumentParser(
             prog='trakd',
             description='Keep track of process runtime',
         )
         parser.add_argument('-v', '--version', action='version', version=f'v{__version__}')
 
         subparsers = parser.add_subparsers(dest='command')
-        
-        server_parser = subparsers.add_parser('server', help='manage server')
+        return parser, subparsers
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _build_minimal_parser() -> argparse.ArgumentParser:
+        '''
+        Creates a parser that only registers the command names and their help texts.
+        Used for the top-level help output, which does not need the command arguments.
+        '''
+
+        parser, subparsers = CliManager._build_root_parser()
+        for command, help in _COMMAND_HELP.items():
+            subparsers.add_parser(command, help=help)
+        return parser
+
+    @staticmethod
+    def _parser_builders() -> dict[str, Callable[[argparse._SubParsersAction], None]]:
+        '''
+        Returns the subparser builder of each top-level command, in help display order.
+        '''
+
+        return {
+            'server': CliManager._add_server_parser,
+            'ls': CliManager._add_ls_parser,
+            'add': CliManager._add_add_parser,
+            'rm': CliManager._add_rm_parser,
+            'ps': CliManager._add_ps_parser,
+            'rename': CliManager._add_rename_parser,
+            'report': CliManager._add_report_parser,
+            'user': CliManager._add_user_parser,
+            'config': CliManager._add_config_parser,
+            'reset': CliManager._add_reset_parser,
+        }
+
+    @staticmethod
+    def _add_server_parser(subparsers: argparse._SubParsersAction) -> None:
+        '''
+        Registers the "server" command and its subcommands.
+        '''
+
+        server_parser = subparsers.add_parser('server', help=_COMMAND_HELP['server'])
         server_subparser = server_parser.add_subparsers(dest='subcommand', required=True)
         
         server_subparser.add_parser('run', help=argparse.SUPPRESS) 
@@ -79,34 +273,76 @@ class CliManager:
         server_subparser.add_parser('disable', help='disable socket service')
         server_start_parser = server_subparser.add_parser('start', help='start socket server')
         server_start_parser.add_argument('-d', '--daemonize', action='store_true', help='daemon mode')
-        server_status_parser = server_subparser.add_parser('status', help='show the status of the server')
-        server_stop_parser = server_subparser.add_parser('stop', help='stop socket server')
-        
-        ls_parser = subparsers.add_parser('ls', help='list all processes')
+        server_subparser.add_parser('status', help='show the status of the server')
+        server_subparser.add_parser('stop', help='stop socket server')
+
+    @staticmethod
+    def _add_ls_parser(subparsers: argparse._SubParsersAction) -> None:
+        '''
+        Registers the "ls" command.
+        '''
 
-        add_parser = subparsers.add_parser('add', help='start tracking a process')
+        subparsers.add_parser('ls', help=_COMMAND_HELP['ls'])
+
+    @staticmethod
+    def _add_add_parser(subparsers: argparse._SubParsersAction) -> None:
+        '''
+        Registers the "add" command.
+        '''
+
+        add_parser = subparsers.add_parser('add', help=_COMMAND_HELP['add'])
         add_parser.add_argument('process', help='process name or pid to track')
-        add_parser.add_argument('-n', '--name', type=self._len_check, help='add custom tracking id')
+        add_parser.add_argument('-n', '--name', type=_len_check, help='add custom tracking id')
         add_parser.add_argument('--fg', action='store_true', help='foreground mode')
 
-        rm_parser = subparsers.add_parser('rm', help='stop tracking a process')
+    @staticmethod
+    def _add_rm_parser(subparsers: argparse._SubParsersAction) -> None:
+        '''
+        Registers the "rm" command.
+        '''
+
+        rm_parser = subparsers.add_parser('rm', help=_COMMAND_HELP['rm'])
         rm_parser.add_argument('id', help='id of the tracked process to stop')
         rm_parser.add_argument('-v', '--verbose', action='store_true', help='show what is being done')
 
-        ps_parser = subparsers.add_parser('ps', help='show status of tracked processes')
+    @staticmethod
+    def _add_ps_parser(subparsers: argparse._SubParsersAction) -> None:
+        '''
+        Registers the "ps" command.
+        '''
+
+        ps_parser = subparsers.add_parser('ps', help=_COMMAND_HELP['ps'])
         ps_parser.add_argument('-a', '--all', action='store_true', help='show both currently tracked and stopped processes')
         ps_parser.add_argument('-d', '--detailed', action='store_true', help='show detailed information about tracked processes')
 
-        rename_parser = subparsers.add_parser('rename', help='rename tracking id of a process')
+    @staticmethod
+    def _add_rename_parser(subparsers: argparse._SubParsersAction) -> None:
+        '''
+        Registers the "rename" command.
+        '''
+
+        rename_parser = subparsers.add_parser('rename', help=_COMMAND_HELP['rename'])
         rename_parser.add_argument('id', help='current tracking id')
-        rename_parser.add_argument('new_id', type=self._len_check, help='new tracking id')
+        rename_parser.add_argument('new_id', type=_len_check, help='new tracking id')
         rename_parser.add_argument('-v', '--verbose', action='store_true', help='show what is being done')
 
-        report_parser = subparsers.add_parser('report', help='show report')
-        report_parser.add_argument('-s', '--start', default=datetime.combine(date.today(), datetime.min.time()), help='start date (e.g., "2 months ago", "1 week ago", "2025-06-12")')
-        report_parser.add_argument('-e', '--end', default=datetime.now(), help='end date (e.g., "today", "yesterday", "2025-07-12")')
+    @staticmethod
+    def _add_report_parser(subparsers: argparse._SubParsersAction) -> None:
+        '''
+        Registers the "report" command.
+        '''
+
+        report_parser = subparsers.add_parser('report', help=_COMMAND_HELP['report'])
+        report_parser.add_argument('-s', '--start', help='start date (e.g., "2 months ago", "1 week ago", "2025-06-12")')
+        report_parser.add_argument('-e', '--end', help='end date (e.g., "today", "yesterday", "2025-07-12")')
 
-        user_parser = subparsers.add_parser('user', help='manage users')
+    @staticmethod
+    def _add_user_parser(subparsers: argparse._SubParsersAction) -> None:
+        '''
+        Registers the "user" command and its subcommands.
+        '''
+
+        user_parser = subparsers.add_parser('user', help=_COMMAND_HELP['user'])
         user_subparsers = user_parser.add_subparsers(dest='subcommand', required=True)
 
         user_add_parser = user_subparsers.add_parser('add', help='add a new user')
@@ -123,9 +359,15 @@ class CliManager:
         user_rename_parser.add_argument('old_username')
         user_rename_parser.add_argument('new_username')
         user_rename_parser.add_argument('-v', '--verbose', action='store_true', help='show what is being done')
-        user_list_parser = user_subparsers.add_parser('ls', help='list all users')
+        user_subparsers.add_parser('ls', help='list all users')
 
-        config_parser = subparsers.add_parser('config', help='manage configuration')
+    @staticmethod
+    def _add_config_parser(subparsers: argparse._SubParsersAction) -> None:
+        '''
+        Registers the "config" command and its subcommands.
+        '''
+
+        config_parser = subparsers.add_parser('config', help=_COMMAND_HELP['config'])
         config_subparsers = config_parser.add_subparsers(dest='subcommand', required=True)
 
         config_set_parser = config_subparsers.add_parser('set', help='set configuration')
@@ -133,69 +375,80 @@ class CliManager:
         config_set_parser.add_argument('-p', '--port', type=int, help='set port number')
         config_set_parser.add_argument('-l', '--limit_max_process', type=int, help='set the maximum number of concurrently tracked processes')
         config_set_parser.add_argument('-v', '--verbose', action='store_true', help='show what is being done')
-        config_show_parser = config_subparsers.add_parser('show', help='show current configuration')
+        config_subparsers.add_parser('show', help='show current configuration')
+
+    @staticmethod
+    def _add_reset_parser(subparsers: argparse._SubParsersAction) -> None:
+        '''
+        Registers the "reset" command.
+        '''
 
-        reset_parser = subparsers.add_parser('reset', help='reset program')
+        reset_parser = subparsers.add_parser('reset', help=_COMMAND_HELP['reset'])
         reset_parser.add_argument('target', choices=['all', 'config', 'logs'], help='what to reset')
         reset_parser.add_argument('-y', '--yes', action='store_true', help='skip confirmation')
         reset_parser.add_argument('-v', '--verbose', action='store_true', help='show what is being done')
 
-        args = parser.parse_args()
-        self._arg_controller(args)
-    
     def _arg_controller(self, args: argparse.Namespace) -> None:
         '''
         Handles and delegates CLI commands to the appropriate methods.
         '''
 
         command = args.command
-        client = self.client 
-        server = self.server
 
         if command == None: 
-            print(f'{BOLD}TRAKD v{__version__}{RESET} - {GREY}Keep track of process runtime{RESET}\nStart using with {YELLOW}\'trakd --help\'{RESET}')
+            self._print_banner()
             return
         
         if command == 'server':
             subcommand = args.subcommand
             
             if subcommand == 'run':
-                server.run_server()
+                self.server.run_server()
                 return
 
             if subcommand == 'start' and args.daemonize:
-                daemonize(server.run_server)()  
+                from daemonize import daemonize
+                daemonize(self.server.run_server)()  
                 return              
 
-            server_subcommands = ['start', 'install', 'remove', 'enable', 'disable']
-            
-            if is_windows and subcommand in server_subcommands:
+            if is_windows and subcommand in _SERVER_SUBCOMMANDS:
                 self._windows_service_handler(subcommand)
 
-            elif subcommand in server_subcommands:
+            elif subcommand in _SERVER_SUBCOMMANDS:
                 self._systemd_handler(subcommand)
             
             elif subcommand == 'status':
-                client.status_handler()
+                self.client.status_handler()
                 
             elif subcommand == 'stop':
-                client.stop_handler()
+                self.client.stop_handler()
             return
 
-        command_handlers = {
-            'ls': client.ls_handler,
-            'add': lambda: daemonize(client.add_handler)(args),
-            'rm': lambda: client.rm_handler(args),
-            'ps': lambda: client.ps_handler(args),
-            'rename': lambda: client.rename_handler(args),
-            'report': lambda: client.report_handler(args),
-            'user': lambda: client.user_handler(args),
-            'config': lambda: client.config_handler(args),
-            'reset': lambda: client.reset_handler(args)
-        }
-
-        if command in command_handlers:
-            command_handlers[command]()
+        client = self.client
+
+        match command:
+            case 'ls':
+                client.ls_handler()
+            case 'add':
+                if args.fg:
+                    client.add_handler(args)
+                else:
+                    from daemonize import daemonize
+                    daemonize(client.add_handler)(args)
+            case 'rm':
+                client.rm_handler(args)
+            case 'ps':
+                client.ps_handler(args)
+            case 'rename':
+                client.rename_handler(args)
+            case 'report':
+                client.report_handler(args)
+            case 'user':
+                client.user_handler(args)
+            case 'config':
+                client.config_handler(args)
+            case 'reset':
+                client.reset_handler(args)
 
     def _windows_service_handler(self, subcommand: str) -> None:
         '''
@@ -204,6 +457,8 @@ class CliManager:
         - For other subcommands, it manages the execution of a service script (service.exe or service.py).
         '''
 
+        import subprocess
+
         self._is_admin()
 
         if subcommand == 'enable':
@@ -224,20 +479,13 @@ class CliManager:
 
         # start/install/remove
         else:
-            if is_frozen:
-                base_path = Path(sys.executable).parent
-                service_path = base_path / 'service.exe'
-                cmd = [str(service_path), subcommand]
-            else:
-                base_path = Path(__file__).resolve().parent.parent
-                service_path = base_path / 'service.py'
-                cmd = [sys.executable, str(service_path), subcommand]
-            
+            base_path, service_name, service_path, cmd_prefix = _service_paths()
+
             try:
                 if not service_path.exists():
-                    raise Exception(f'{'service.exe' if is_frozen else 'service.py'} not found at {base_path}')
+                    raise Exception(f'{service_name} not found at {base_path}')
 
-                subprocess.run(cmd, check=True)
+                subprocess.run([*cmd_prefix, subcommand], check=True)
             except subprocess.CalledProcessError as e:
                 sys.exit(1)
             except Exception as e:
@@ -251,6 +499,8 @@ class CliManager:
         - Manages service states (start, stop, enable, disable) using systemd commands
         '''
 
+        import subprocess
+
         self._is_admin()
         username, home = self._get_current_user()
         
@@ -299,8 +549,7 @@ WantedBy=multi-user.target
                 if not service_path.exists():
                     raise Exception('Service \'trakd\' not found on this system')
                 
-                subprocess.run(['systemctl', 'stop', service_name], check=True)
-                subprocess.run(['systemctl', 'disable', service_name], check=True)
+                subprocess.run(['systemctl', 'disable', '--now', service_name], check=True)
                 subprocess.run(['systemctl', 'daemon-reload'], check=True)
                 
                 service_path.unlink()
@@ -334,13 +583,10 @@ WantedBy=multi-user.target
         '''
 
         try:
-            if is_windows:
-                import ctypes
-                if ctypes.windll.shell32.IsUserAnAdmin() == 0:
+            if not _ADMIN_CHECK():
+                if is_windows:
                     raise Exception('Administrator privileges required, run the command as administrator')
-            else:
-                if os.getuid() != 0:
-                    raise Exception('Root privileges required, run the command with sudo')
+                raise Exception('Root privileges required, run the command with sudo')
         except Exception as e:
             logger.error(e)
             sys.exit(1)
@@ -350,23 +596,4 @@ WantedBy=multi-user.target
         Retrieves the current user's username and home directory.
         '''
 
-        import pwd
-
-        if 'SUDO_USER' in os.environ and os.geteuid() == 0:
-            username = os.environ['SUDO_USER']
-            uid = int(os.environ['SUDO_UID'])
-            try:
-                pw_entry = pwd.getpwuid(uid)
-                if pw_entry.pw_name == username:
-                    return username, Path(pw_entry.pw_dir)
-            except (KeyError, ValueError):
-                pass
-
-        try:
-            username = pwd.getpwuid(os.getuid()).pw_name
-            home = Path.home()
-        except Exception:
-            logger.error('An error occurred while retrieving current user information')
-            sys.exit(1)
-
-        return username, home
\ No newline at end of file
+        return _resolve_user(os.getuid(), os.geteuid(), os.environ.get('SUDO_USER'), os.environ.get('SUDO_UID'))
\ No newline at end of file
@@ -1,8 +1,8 @@
 import socket
 import sys
-import json
 from threading import Event
 from logger import logger
+from protocol import encode_json, send_message, recv_message
 from typing import Union, Optional
 
 class ClientSocketManager:
@@ -29,6 +29,7 @@ class ClientSocketManager:
         '''
         Creates a connection to the server by establishing a socket connection.
         - Attempts to connect to the specified server IP and port
+        - Disables Nagle's algorithm so small command messages are sent immediately
         - Returns True if the connection is successful and return_bool is True
         - Handles different exceptions and logs them
         '''
@@ -38,6 +39,8 @@ class ClientSocketManager:
                 raise Exception('Please create a user or switch to an existing user to perform')
             
             self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
             self.client_socket.settimeout(self.timeout)
 
             self.client_socket.connect((self.ip, self.port))
@@ -50,9 +53,9 @@ class ClientSocketManager:
             if return_bool: return False
             logger.error(f'Address-related error connecting to {self.ip}:{self.port}')
             sys.exit(1)
-        except socket.error:
+        except OSError:
             if return_bool: return False
-            logger.error(f'There may be a problem with the host ip address and port configuration')
+            logger.error('There may be a problem with the host ip address and port configuration')
             sys.exit(1)
         except Exception as e:
             if return_bool: return False
@@ -71,9 +74,8 @@ class ClientSocketManager:
             with socket.create_connection((self.ip, self.port), timeout=self.timeout):
                 if return_bool: return True
                 raise Exception('Cannot be performed while the server is running')
-        except (socket.error, socket.timeout, OSError, socket.gaierror):
+        except OSError:
             if return_bool: return False
-            pass
         except Exception as e:
             if return_bool: return False
             logger.error(e)
@@ -83,17 +85,16 @@ class ClientSocketManager:
 
     def is_ip_valid(self, ip: str, port: int) -> bool:
         '''
-        Validates if the IP address and port can be reached and are correct.
-        Returns True if the connection can be established, otherwise exits the program with an error.
+        Validates that the server could bind to the IP address and port.
+        - Binds a throwaway socket without listening, so the port is never left accepting connections
+        - SO_REUSEADDR keeps a recently stopped server's TIME_WAIT sockets from failing the check
+        Returns True if the address can be bound, otherwise exits the program with an error.
         '''
 
-        sock = None
-
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(self.timeout)
-            sock.bind((ip, port))
-            sock.listen(1)
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                sock.bind((ip, port))
             return True
         except PermissionError:
             logger.error(f'Permission denied on {ip}:{port}')
@@ -106,28 +107,28 @@ class ClientSocketManager:
             sys.exit(1)
         except KeyboardInterrupt:
             sys.exit(1)
-        finally:
-            if sock: sock.close()
 
     def send_data(self, data: Union[str, dict], wait_for_response: bool=True, event: Event=None) -> Optional[str]:
         '''
         Sends data to the server. Send either a string or a dictionary (which will be converted to JSON).
         Optionally waits for a response from the server.
+        - Messages are length-prefixed in both directions, so responses of any size arrive whole
         '''
 
-        if isinstance(data, dict):
-            data = json.dumps(data)
+        payload = encode_json(data) if isinstance(data, dict) else data.encode('utf-8')
 
         try:
             if not self.client_socket:
                 raise Exception('Socket not initialized, please create connection first.')
             
-            self.client_socket.sendall(data.encode('utf-8'))
+            send_message(self.client_socket, payload)
 
             if wait_for_response:
-                received_data = self.client_socket.recv(4096)
+                received_data = recv_message(self.client_socket)
+                if received_data is None:
+                    raise ConnectionResetError
                 return received_data.decode('utf-8')
-        except (BrokenPipeError, ConnectionResetError, socket.error):
+        except OSError:
             if event: 
                 event.set()
             self.client_socket.close()
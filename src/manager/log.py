@@ -1,9 +1,16 @@
 import os
+import sys
+import threading
+from collections import defaultdict
 from datetime import datetime, timedelta
 from filelock import FileLock
 from contextlib import contextmanager
 from typing import Generator
 from constants import TRAKD_DIR
+from type import LogInfo, LogType
+
+START_OF_DAY_SUFFIX = 'T00:00:00'
+END_OF_DAY_SUFFIX = 'T23:59:59.999999'
 
 class LogManager:
     '''
@@ -12,11 +19,15 @@ class LogManager:
     to save and retrieve logs for specific processes.
     '''
 
+    _thread_locks: dict[str, threading.Lock] = {}
+    _thread_locks_guard = threading.Lock()
+
     def __init__(self, username: str):
         '''
         Initializes LogManager attributes:
         - Sets up the logs directory for the user
         - Creates a lock file for synchronizing access to logs
+        - Shares one thread lock per lock file and keeps a single FileLock instance
         - Creates the directory if it doesn't exist
         '''
 
@@ -25,6 +36,10 @@ class LogManager:
         if username is not None:
             self.logs_dir = os.path.join(TRAKD_DIR, 'logs', self.username)
             self.lock_file = os.path.join(self.logs_dir, 'lck.lock')
+            self._file_lock = FileLock(self.lock_file)
+
+            with LogManager._thread_locks_guard:
+                self._thread_lock = LogManager._thread_locks.setdefault(self.lock_file, threading.Lock())
 
             if not os.path.exists(self.logs_dir):
                  os.makedirs(self.logs_dir)           
@@ -33,51 +48,55 @@ class LogManager:
     def _manage_lock(self) -> Generator[None, None, None]:
         '''
         Context manager for handling file locks.
-        - Ensures that only one process can access and modify log data at a time
+        - Serializes threads of this process on a shared thread lock first
+        - Then ensures that only one process can access and modify log data at a time
         '''
 
-        lock = FileLock(self.lock_file)
-        with lock:
-            yield
+        with self._thread_lock:
+            with self._file_lock:
+                yield
 
-    def _write_logs(self, path: str, data: dict) -> None:
+    def _log_path(self, key: str) -> str:
         '''
-        Writes the log data to a specified file.
-        - Converts the dictionary data to a string format and writes to the file
+        Returns the path of the log file for the given day key (YYYYMMDD).
         '''
 
-        log = ''
-        for key in data:
-            log += '\n'.join(f'{key}|{t['start_time']}|{t['end_time']}' for t in data[key]) + '\n'
+        return f'{self.logs_dir}{os.sep}{key}'
+
+    def _write_logs(self, path: str, data: LogType) -> None:
+        '''
+        Writes the log data to a specified file.
+        - Streams one formatted line per time interval into a buffered file
+        '''
 
-        with open(path, 'w') as f:
-            f.write(log)
+        with open(path, 'w', buffering=1 << 16) as f:
+            f.writelines(
+                f'{key}|{t.start_time}|{t.end_time}\n'
+                for key, times in data.items() for t in times
+            )
 
-    def get_logs(self, path: str) -> dict:
+    def get_logs(self, path: str) -> LogType:
         '''
         Retrieves log data from a file and returns it as a dictionary.
-        - Parses the file to extract process start and end times
-        - Returns a dictionary where the key is the process name and the value is a list of time intervals
+        - Always parses the file, since other tracker processes may have rewritten it since the last call
+        - Extracts process start and end times
+        - Returns a dictionary where the key is the (interned) process name and the value is a list of LogInfo intervals
         '''
 
-        data = {}
+        data = defaultdict(list)
         try:
-            with open(path, 'r') as f:
+            with open(path, 'r', buffering=1 << 16) as f:
                 for line in f:
-                    if not line.strip():
+                    parts = line.rstrip('\n').split('|', 2)
+                    if len(parts) != 3:
                         continue
-                    p, s, e = [x.strip() for x in line.strip().split('|')]
+                    p, s, e = parts
 
-                    if p not in data: 
-                        data[p] = []
+                    data[sys.intern(p)].append(LogInfo(s, e))
+        except FileNotFoundError:
+            return {}
 
-                    data[p].append({
-                        'start_time': s,
-                        'end_time': e
-                    })
-        except:
-            pass
-        return data
+        return dict(data)
 
     def save_start_time(self, process_name: str, start_time: datetime) -> None:
         '''
@@ -85,12 +104,10 @@ class LogManager:
         - Writes the start time of the process to the log file corresponding to the current date
         '''
 
-        log_file = os.path.join(self.logs_dir, start_time.strftime('%Y%m%d'))
+        log_file = self._log_path(start_time.strftime('%Y%m%d'))
 
-        inf = { 
-            'start_time': start_time.isoformat(),
-            'end_time': start_time.isoformat()
-        }
+        start_iso = start_time.isoformat()
+        inf = LogInfo(start_iso, start_iso)
 
         with self._manage_lock():
             data = self.get_logs(log_file)
@@ -110,38 +127,36 @@ class LogManager:
         '''
         
         now = datetime.now()
-        log_file = os.path.join(self.logs_dir, now.strftime('%Y%m%d'))
+        today_key = now.strftime('%Y%m%d')
+        log_file = self._log_path(today_key)
 
         with self._manage_lock():
             if start_time.date() != now.date():
-                elapsed_day = (now - start_time).days
+                elapsed_day = (now.date() - start_time.date()).days
+                now_iso = now.isoformat()
+                today_midnight_iso = f'{now.date().isoformat()}{START_OF_DAY_SUFFIX}'
 
                 for day in range(elapsed_day + 1):
                     t = now - timedelta(days=day)
-                    daily_log_file = os.path.join(self.logs_dir, t.strftime('%Y%m%d'))
+                    daily_log_file = log_file if day == 0 else self._log_path(t.strftime('%Y%m%d'))
+                    day_iso = t.date().isoformat()
 
                     daily_data = self.get_logs(daily_log_file)
 
-                    if t.date() == now.date():
-                        inf = {
-                            'start_time': now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat(),
-                            'end_time': now.isoformat()
-                        }
-                        daily_data[process_name] = [inf]
-                    elif t.date() == start_time.date():
-                        daily_data[process_name][-1]['end_time'] = t.replace(hour=23, minute=59, second=59, microsecond=999999).isoformat()
+                    if day == 0:
+                        daily_data[process_name] = [LogInfo(today_midnight_iso, now_iso)]
+                    elif day == elapsed_day:
+                        intervals = daily_data[process_name]
+                        intervals[-1] = intervals[-1]._replace(end_time=f'{day_iso}{END_OF_DAY_SUFFIX}')
                     else:
-                        inf = {
-                            'start_time': t.replace(hour=0, minute=0, second=0, microsecond=0).isoformat(),
-                            'end_time': t.replace(hour=23, minute=59, second=59, microsecond=999999).isoformat()
-                        }
-                        daily_data[process_name] = [inf]
+                        daily_data[process_name] = [LogInfo(f'{day_iso}{START_OF_DAY_SUFFIX}', f'{day_iso}{END_OF_DAY_SUFFIX}')]
 
                     self._write_logs(daily_log_file, daily_data)
             else:
                 data = self.get_logs(log_file)
 
                 if process_name in data:
-                    data[process_name][-1]['end_time'] = now.isoformat()
+                    intervals = data[process_name]
+                    intervals[-1] = intervals[-1]._replace(end_time=now.isoformat())
 
                 self._write_logs(log_file, data)
\ No newline at end of file
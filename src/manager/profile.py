@@ -1,10 +1,18 @@
 import os
 import shutil
+import stat
+import tempfile
+import threading
 from typing import Callable, Generator, List, Optional, Tuple
 from constants import TRAKD_DIR, DEFAULT_IP_ADDRESS, DEFAULT_PORT, DEFAULT_LIMIT
 from filelock import FileLock
 from contextlib import contextmanager
 from type import ProfileType
+from logger import logger
+
+_proc_lock = threading.RLock()
+
+_ROW = '{}|{}|{}|{}|{}\n'.format
 
 class ProfileManager:
     '''
@@ -13,81 +21,116 @@ class ProfileManager:
     Handles the directory and file operations needed for profile storage.
     '''
 
-    @staticmethod
-    def _create_trakd_dir() -> None:
+    def __init__(self):
         '''
-        Creates the directory where profile-related files are stored.
+        Initializes ProfileManager attributes:
+        - Creates the directory where profile-related files are stored
+        - _profile_file / _lock_file: Paths of the profile file and its lock, resolved once
+        - _cache: Last parsed list of profiles; the rows are immutable, so copies of the list can share them
+        - _cache_key: (mtime, size) of the profile file the cache was built from
         '''
 
         os.makedirs(TRAKD_DIR, exist_ok=True)
+        self._profile_file = os.path.join(TRAKD_DIR, 'profile')
+        self._lock_file = os.path.join(TRAKD_DIR, 'lck.lock')
 
-    @staticmethod
-    def _profile_path() -> str:
-        '''
-        Returns the full path to the profile file.
-        - The profile file contains user profile details
-        '''
-
-        ProfileManager._create_trakd_dir()
-        return os.path.join(TRAKD_DIR, 'profile')
+        self._cache: Optional[List[ProfileType]] = None
+        self._cache_key: Optional[Tuple[int, int]] = None
 
     @staticmethod
     @contextmanager
-    def _manage_lock(lock_file: str) -> Generator[None, None, None]:
+    def _manage_lock(lock_file: str, cross_process: bool = True) -> Generator[None, None, None]:
         '''
         Context manager for handling file locks.
-        - Ensures that only one process can access and modify profile data at a time
+        - Always takes the process-wide lock, so threads of this process are serialized
+        - Ensures that only one process can access and modify profile data at a time when cross_process is True
+        - Callers already holding the file lock pass cross_process=False
         '''
         
-        lock = FileLock(lock_file)
-        with lock:
-            yield
-
-    def _write_profiles(self, profiles: List[ProfileType]) -> None:
+        with _proc_lock:
+            if cross_process:
+                with FileLock(lock_file):
+                    yield
+            else:
+                yield
+
+    def _write_profiles(self, profiles: List[ProfileType], cross_process: bool = True) -> None:
         '''
         Writes the list of profiles to the profile file.
-        - Converts the profiles into a formatted string and writes it to the file
+        - Formats every row with one format call and writes the bytes with a single buffered write, which retries short writes
+        - Writes to a temporary file, fsyncs it and atomically replaces the profile file, so a crash never leaves it truncated
+        - Refreshes the cache from the written list, so the next read does not re-parse the file
         '''
 
-        profile_path = self._profile_path()
-        data = '\n'.join(f'{p['username']}|{p['ip']}|{p['port']}|{p['limit']}|{p['selected']}' for p in profiles) + '\n'
+        profile_path = self._profile_file
+        data = ''.join(_ROW(*p) for p in profiles).encode('utf-8')
 
-        lock_file = os.path.join(TRAKD_DIR, 'lck.lock')
-        
-        with self._manage_lock(lock_file):
-            with open(profile_path, 'w', encoding='utf-8') as f:
-                f.write(data)
+        with self._manage_lock(self._lock_file, cross_process):
+            try:
+                mode = stat.S_IMODE(os.stat(profile_path).st_mode)
+            except FileNotFoundError:
+                mode = 0o644
+
+            fd, tmp_path = tempfile.mkstemp(dir=TRAKD_DIR, prefix='.profile.')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                os.chmod(tmp_path, mode)
+                os.replace(tmp_path, profile_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+            st = os.stat(profile_path)
+
+            self._cache = list(profiles)
+            self._cache_key = (st.st_mtime_ns, st.st_size)
 
-    def get_profiles(self) -> List[ProfileType]:
+    def get_profiles(self, cross_process: bool = True) -> List[ProfileType]:
         '''
         Retrieves all profiles from the profile file.
-        - Reads the profile data and returns it as a list of dictionaries
+        - Returns a copy of the cached profiles if the file is unchanged since it was last read or written
+        - Otherwise reads the profile data and returns it as a list of ProfileType tuples
         '''
 
-        profile_path = self._profile_path()
-        profiles: List[ProfileType] = []
-        lock_file = os.path.join(TRAKD_DIR, 'lck.lock')
+        profile_path = self._profile_file
+
+        try:
+            st = os.stat(profile_path)
+            if (st.st_mtime_ns, st.st_size) == self._cache_key:
+                return list(self._cache)
+        except OSError:
+            pass
 
-        with self._manage_lock(lock_file):
+        profiles: List[ProfileType] = []
+        with self._manage_lock(self._lock_file, cross_process):
             try:
                 with open(profile_path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        line = line.strip()
+                    st = os.fstat(f.fileno())
+                    cache_key = (st.st_mtime_ns, st.st_size)
 
-                        if not line:
+                    for line in f:
+                        parts = line.rstrip('\n').split('|')
+                        if len(parts) != 5:
                             continue
 
-                        u, i, p, l, s = (x.strip() for x in line.split('|'))
+                        u, i, p, l, s = parts
                         
-                        profiles.append({
-                            'username': u,
-                            'ip': i,
-                            'port': int(p),
-                            'limit': int(l),
-                            'selected': int(s),
-                        })
-            except:
-                pass
+                        try:
+                            profiles.append(ProfileType(u.strip(), i, int(p), int(l), int(s)))
+                        except ValueError:
+                            logger.warning(f'Skipping malformed profile entry: {line.strip()}')
+            except FileNotFoundError:
+                self._cache = None
+                self._cache_key = None
+                return []
+
+            self._cache = list(profiles)
+            self._cache_key = cache_key
         return profiles
 
     def get_current_profile(self) -> Tuple[Optional[str], Optional[str], Optional[int], Optional[int]]:
@@ -98,9 +141,9 @@ class ProfileManager:
         '''
 
         for p in self.get_profiles():
-            if p['selected']:
-                limit = max(1, min(p['limit'], 24))
-                return p['username'], p['ip'], p['port'], limit
+            if p.selected:
+                limit = max(1, min(p.limit, 24))
+                return p.username, p.ip, p.port, limit
         return None, None, None, None
 
     def _modify_profiles(
@@ -110,16 +153,20 @@ class ProfileManager:
     ) -> bool:
         '''
         Modifies the list of profiles.
+        - Holds the file lock across the read, the modifier call and the write, so no other process can interleave
         - Calls the provided modifier function to apply changes to the profiles list
-        - If successful, writes the modified profiles back to the profile file
+        - If successful, writes the modified profiles back to the profile file, unless they equal what is already on disk
         - Optionally calls a post-action function after modifying profiles
         '''
         
-        profiles = self.get_profiles()
-        if not modifier(profiles):
-            return False
+        with self._manage_lock(self._lock_file):
+            profiles = self.get_profiles(cross_process=False)
+            if not modifier(profiles):
+                return False
+
+            if profiles != self._cache:
+                self._write_profiles(profiles, cross_process=False)
 
-        self._write_profiles(profiles)
         if post_action:
             post_action()
         return True
@@ -138,20 +185,16 @@ class ProfileManager:
         - If the profile is successfully created, also creates the user's log directory
         '''
 
+        target = username.strip()
+
         def modifier(profiles):
-            if any(p['username'].strip() == username.strip() for p in profiles):
+            if any(p.username == target for p in profiles):
                 return False
-            profiles.append({
-                'username': username,
-                'ip': ip,
-                'port': port,
-                'limit': limit,
-                'selected': selected,
-            })
+            profiles.append(ProfileType(target, ip, port, limit, selected))
             return True
 
         def post_action():
-            logs_dir = os.path.join(TRAKD_DIR, 'logs', username)
+            logs_dir = os.path.join(TRAKD_DIR, 'logs', target)
             os.makedirs(logs_dir, exist_ok=True)
 
         return self._modify_profiles(modifier, post_action)
@@ -163,13 +206,15 @@ class ProfileManager:
         - Also removes the user's corresponding log directory
         '''
 
+        target = username.strip()
+
         def modifier(profiles):
             old_len = len(profiles)
-            profiles[:] = [p for p in profiles if p['username'].strip() != username.strip()]
+            profiles[:] = [p for p in profiles if p.username != target]
             return len(profiles) < old_len
 
         def post_action():
-            logs_dir = os.path.join(TRAKD_DIR, 'logs', username)
+            logs_dir = os.path.join(TRAKD_DIR, 'logs', target)
             if os.path.isdir(logs_dir):
                 shutil.rmtree(logs_dir)
 
@@ -179,18 +224,30 @@ class ProfileManager:
         '''
         Switches the currently selected profile.
         - Marks the profile with the specified username as selected
-        - Unmarks all other profiles
+        - Unmarks the previously selected profile
+        - Leaves the file untouched when the profile is already the selected one
         '''
 
+        name = username.strip()
+
         def modifier(profiles):
-            found = False
-            for p in profiles:
-                if p['username'].strip() == username.strip():
-                    p['selected'] = 1
-                    found = True
-                else:
-                    p['selected'] = 0
-            return found
+            target = None
+            selected = []
+            for index, p in enumerate(profiles):
+                if target is None and p.username == name:
+                    target = index
+                if p.selected:
+                    selected.append(index)
+
+            if target is None:
+                return False
+            if selected == [target]:
+                return True
+
+            for index in selected:
+                profiles[index] = profiles[index]._replace(selected=0)
+            profiles[target] = profiles[target]._replace(selected=1)
+            return True
         
         return self._modify_profiles(modifier)
 
@@ -201,16 +258,18 @@ class ProfileManager:
         - Renames the user's log directory accordingly
         '''
 
-        old_dir = os.path.join(TRAKD_DIR, 'logs', old_username)
-        new_dir = os.path.join(TRAKD_DIR, 'logs', new_username)
+        old_target = old_username.strip()
+        new_target = new_username.strip()
+        old_dir = os.path.join(TRAKD_DIR, 'logs', old_target)
+        new_dir = os.path.join(TRAKD_DIR, 'logs', new_target)
         
         def modifier(profiles):
-            if any(p['username'].strip() == new_username.strip() for p in profiles):
+            if any(p.username == new_target for p in profiles):
                 return False
 
-            for p in profiles:
-                if p['username'].strip() == old_username.strip():
-                    p['username'] = new_username
+            for index, p in enumerate(profiles):
+                if p.username == old_target:
+                    profiles[index] = p._replace(username=new_target)
                     return True
             return False
 
@@ -227,10 +286,12 @@ class ProfileManager:
         - Modifies the IP address, port, and limit for the specified profile
         '''
 
+        target = username.strip()
+
         def modifier(profiles):
-            for p in profiles:
-                if p['username'].strip() == username.strip():
-                    p['ip'], p['port'], p['limit'] = ip, port, limit
+            for index, p in enumerate(profiles):
+                if p.username == target:
+                    profiles[index] = p._replace(ip=ip, port=port, limit=limit)
                     return True
             return False
 
@@ -0,0 +1,139 @@
+import json
+import socket
+from typing import Any, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HEADER_SIZE = 4
+BYTE_ORDER = 'big'
+MAX_FRAME_SIZE = 1 << 20
+_JSON_ENCODE = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+_HAS_SENDMSG = hasattr(socket.socket, 'sendmsg')
+
+class ProtocolError(ConnectionError):
+    '''
+    Raised when a peer announces a frame larger than MAX_FRAME_SIZE.
+    - Subclasses ConnectionError, so callers that already treat OSError as a lost connection drop the stream
+    '''
+
+def _frame_size(header: Union[bytes, bytearray]) -> int:
+    '''
+    Decodes a length header and rejects sizes above MAX_FRAME_SIZE.
+    - Keeps an unframed or hostile peer from making the reader allocate or buffer gigabytes
+    '''
+
+    size = int.from_bytes(header, BYTE_ORDER)
+    if size > MAX_FRAME_SIZE:
+        raise ProtocolError(f'Frame of {size} bytes exceeds the {MAX_FRAME_SIZE} byte limit')
+    return size
+
+def encode_json(data: Any) -> bytes:
+    '''
+    Serializes data to compact UTF-8 JSON bytes for the wire.
+    - Uses orjson when it is installed, otherwise a prebuilt compact json encoder
+    '''
+
+    if orjson is not None:
+        return orjson.dumps(data)
+    return _JSON_ENCODE(data).encode('utf-8')
+
+def decode_json(data: Union[bytes, bytearray]) -> Any:
+    '''
+    Parses JSON received from the wire.
+    - Uses orjson when it is installed, otherwise the stdlib json parser
+    - Raises json.JSONDecodeError (orjson's error subclasses it) or UnicodeDecodeError on malformed input
+    '''
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def frame_message(payload: bytes) -> bytes:
+    '''
+    Returns the payload prefixed with its length as a 4-byte big-endian header.
+    '''
+
+    return len(payload).to_bytes(HEADER_SIZE, BYTE_ORDER) + payload
+
+def send_message(sock: socket.socket, payload: bytes) -> None:
+    '''
+    Sends a single framed message over the socket.
+    - Prefixes the payload with its length as a 4-byte big-endian header
+    - Hands header and payload to sendmsg as two buffers, so the payload is never copied into a combined one
+    - Falls back to a concatenated sendall where sendmsg is unavailable (Windows)
+    '''
+
+    header = len(payload).to_bytes(HEADER_SIZE, BYTE_ORDER)
+
+    if not _HAS_SENDMSG:
+        sock.sendall(header + payload)
+        return
+
+    sent = sock.sendmsg([header, payload])
+    if sent == HEADER_SIZE + len(payload):
+        return
+
+    if sent < HEADER_SIZE:
+        sock.sendall(header[sent:])
+        sent = HEADER_SIZE
+    sock.sendall(memoryview(payload)[sent - HEADER_SIZE:])
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytearray]:
+    '''
+    Reads exactly size bytes from the socket into a single preallocated buffer.
+    - Returns None if the peer closes the connection before the buffer is filled
+    '''
+
+    buf = bytearray(size)
+    view = memoryview(buf)
+    offset = 0
+
+    while offset < size:
+        received = sock.recv_into(view[offset:])
+        if not received:
+            return None
+        offset += received
+
+    return buf
+
+def recv_message(sock: socket.socket) -> Optional[bytearray]:
+    '''
+    Receives a single framed message from the socket.
+    - Reads the 4-byte length header, then the payload it announces
+    - Returns None if the connection was closed
+    - Raises ProtocolError if the announced size exceeds MAX_FRAME_SIZE
+    '''
+
+    header = _recv_exact(sock, HEADER_SIZE)
+    if header is None:
+        return None
+
+    return _recv_exact(sock, _frame_size(header))
+
+def split_messages(buffer: bytearray) -> List[bytes]:
+    '''
+    Removes every complete framed message from the front of the buffer.
+    - Returns their payloads in order
+    - Leaves a trailing partial message in the buffer for the next read
+    - Raises ProtocolError as soon as a header announces more than MAX_FRAME_SIZE bytes
+    '''
+
+    messages = []
+    offset = 0
+    end = len(buffer)
+
+    while end - offset >= HEADER_SIZE:
+        start = offset + HEADER_SIZE
+        size = _frame_size(buffer[offset:start])
+        if end - start < size:
+            break
+
+        messages.append(bytes(buffer[start:start + size]))
+        offset = start + size
+
+    if offset:
+        del buffer[:offset]
+    return messages
@@ -1,14 +1,63 @@
 import socket
-import threading
+import selectors
 import sys
 import json
 import signal
 import time
 from manager import ProfileManager
 from logger import logger
-from typing import Union, Dict
+from protocol import ProtocolError, decode_json, encode_json, frame_message, split_messages
+from typing import Callable, Dict, Optional, Union
 from type import AddType, ProcessInfo, RemoveType, RenameType, ReportType, StatusType, PsType, UpdateType
-from threading import Event, Lock
+from threading import Event
+
+RECV_SIZE = 65536
+_READ = selectors.EVENT_READ
+_READ_WRITE = selectors.EVENT_READ | selectors.EVENT_WRITE
+
+_RESP_OK = b'ok'
+_RESP_ERROR = b'error'
+_RESP_LIMIT = b'limit'
+_RESP_DUPLICATE = b'duplicate'
+_RESP_DUPLICATE_PROCESS = b'duplicate process'
+_RESP_DUPLICATE_ID = b'duplicate id'
+_STOP_MSG = b'stop'
+
+def _decode_command(data: bytes) -> Optional[Union[AddType, RemoveType, RenameType, ReportType, StatusType, PsType, UpdateType]]:
+    '''
+    Decodes one framed message into a command dictionary.
+    - Returns None for payloads that are not JSON objects (e.g. the client's 'ping' keepalive)
+    '''
+
+    try:
+        json_data = decode_json(data)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return json_data if isinstance(json_data, dict) else None
+
+def _is_track_id(value: object) -> bool:
+    '''
+    Checks that a track ID received from a client is a non-empty string, so it can be lowercased and used as a key.
+    '''
+
+    return isinstance(value, str) and bool(value)
+
+class _ConnState:
+    '''
+    Per-connection state kept as the selector key data.
+    - buffer: Bytes received from the client that do not form a complete message yet
+    - out: Framed replies the socket has not accepted yet; the connection is watched for writability while non-empty
+    - addr: Peer address captured once at accept
+    - peer: The address formatted as host/port for ps
+    '''
+
+    __slots__ = ('buffer', 'out', 'addr', 'peer')
+
+    def __init__(self, addr: tuple):
+        self.buffer = bytearray()
+        self.out = bytearray()
+        self.addr = addr
+        self.peer = f'{addr[0]}/{addr[1]}'
 
 class Server:
     '''
@@ -21,78 +70,116 @@ class Server:
         Initializes server attributes:
         - profile_manager: Manages user profiles
         - tracked_processes: Dictionary to store currently tracked processes
+        - _names_lower / _ids_lower: Indexes from lowercased process name / track ID to track ID
+        - _running / _stopped: Number of tracked processes in each status
+        - _conns: Sidecar mapping each track ID to its client connection, kept out of the process entries
+        - _states: State of every open client connection; a tracked connection missing here has disconnected
+        - _limit: Maximum number of tracked processes, read from the profile when the server starts
         - stop_event: Event to signal server shutdown
-        - lock: Lock to safely access shared resources across threads
+        - _wake_recv / _wake_send: Socket pair that wakes the selector loop, so it can block without a timeout
+        - _shutdown_requested: Set by request_shutdown; the loop performs the shutdown itself
+        - _selector: Selector of the running loop, used to watch connections with queued replies for writability
+        - _recv_view: Receive buffer reused for every read; the selector loop is single-threaded, so one is enough
+        - _dispatch: Command name to handler table, every entry called as handler(conn, json_data)
         '''
 
         self.profile_manager = ProfileManager()
         self.tracked_processes: Dict[str, ProcessInfo] = {}
+        self._names_lower: Dict[str, str] = {}
+        self._ids_lower: Dict[str, str] = {}
+        self._running = 0
+        self._stopped = 0
+        self._conns: Dict[str, socket.socket] = {}
+        self._states: Dict[socket.socket, _ConnState] = {}
+        self._limit: Optional[int] = None
         self.stop_event: Event = Event()
-        self.lock: Lock = Lock()
+        self._wake_recv: Optional[socket.socket] = None
+        self._wake_send: Optional[socket.socket] = None
+        self._shutdown_requested = False
+        self._server_socket: Optional[socket.socket] = None
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._recv_view = memoryview(bytearray(RECV_SIZE))
+        self._dispatch: Dict[str, Callable[[socket.socket, dict], None]] = {
+            'add': self.add_handler,
+            'rm': self.rm_handler,
+            'rename': self.rename_handler,
+            'report': lambda conn, json_data: self.report_handler(conn),
+            'stop': lambda conn, json_data: self._graceful_shutdown(),
+            'status': lambda conn, json_data: self.status_handler(conn, self._server_socket),
+            'ps': self.ps_handler,
+            'update': lambda conn, json_data: self.update_handler(json_data),
+        }
     
-    def _handle_client(self, conn: socket.socket, addr: tuple[str, int], server_socket: socket) -> None:
+    def _handle_client(self, conn: socket.socket, state: _ConnState) -> bool:
         '''
-        Handles communication with a connected client.
-        - Receives data from client
-        - Parses JSON commands
-        - Delegates commands to the appropriate handler (add, rm, rename, stop, status, ps, update)
-        - Closes connection when client disconnects or stop_event is set
+        Handles a readable client connection.
+        - Reads whatever the client has sent with a single recv_into the shared receive buffer, then appends it to the connection's buffer
+        - Parses every complete length-prefixed JSON command in the buffer
+        - Ignores messages whose command is missing or not a string, before it is used as a dispatch key
+        - Delegates commands to the appropriate handler through the dispatch table
+        - Returns False when the client disconnected, the connection failed, or it announced an oversized frame, so the caller can close it
         '''
 
-        def convert_json(data: str) -> Union[AddType, RemoveType, RenameType, ReportType, StatusType, PsType, UpdateType, bool]:
-            try:
-                json_data = json.loads(data)
-                return json_data
-            except json.JSONDecodeError:
-                return False
+        view = self._recv_view
+        try:
+            received = conn.recv_into(view)
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
 
-        while not self.stop_event.is_set(): 
-            try:
-                data = conn.recv(4096)
-            except (ConnectionResetError, OSError):
-                break
+        if not received:
+            return False
 
-            if not data:
-                break
-            
-            data = data.decode('utf-8')
-            json_data = convert_json(data)
+        buffer = state.buffer
+        buffer += view[:received]
+        get_handler = self._dispatch.get
+
+        try:
+            messages = split_messages(buffer)
+        except ProtocolError as e:
+            logger.warning('Dropping client %s: %s', state.peer, e)
+            return False
+
+        for message in messages:
+            json_data = _decode_command(message)
             
-            if json_data:
-                match json_data['command']:
-                    case 'add':
-                        self.add_handler(conn, json_data)
-                    case 'rm':
-                        self.rm_handler(conn, json_data)
-                    case 'rename':
-                        self.rename_handler(conn, json_data)
-                    case 'report':
-                        self.report_handler(conn)
-                    case 'stop':
-                        self._graceful_shutdown()
-                    case 'status':
-                        self.status_handler(conn, server_socket)
-                    case 'ps':
-                        self.ps_handler(conn, json_data)
-                    case 'update':
-                        self.update_handler(json_data)
-                    case _:
-                        pass
-                
-        conn.close()
+            if json_data is None:
+                continue
+
+            command = json_data.get('command')
+            if not isinstance(command, str):
+                continue
+
+            handler = get_handler(command)
+            if handler is None:
+                continue
+
+            try:
+                handler(conn, json_data)
+            except OSError:
+                return False
+            except Exception as e:
+                logger.warning('Failed to handle client command: %s', e)
+                return False
+
+        return True
 
     def run_server(self, is_service: bool=False) -> None:
         '''
         Starts the server socket and listens for incoming client connections.
         - Binds to IP and port from configuration
         - Handles errors on binding (address in use, permission issues)
-        - Accepts connections and starts a new thread for each client
-        - Waits for all threads to finish on shutdown
+        - Multiplexes the listening socket and every client connection on one selector
+        - Client sockets are non-blocking; replies a peer is not reading are queued and flushed when it becomes writable
+        - Blocks in select until a socket is ready or the loop is woken up for shutdown
+        - Closes the remaining client connections on shutdown
         '''
 
         server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         
-        username, ip, port, _ = self.profile_manager.get_current_profile()
+        username, ip, port, limit = self.profile_manager.get_current_profile()
+        self._limit = limit
 
         try:
             if username is None:
@@ -104,6 +191,8 @@ class Server:
         if not is_service: 
             signal.signal(signal.SIGTERM, self._signal_handler)
             signal.signal(signal.SIGINT, self._signal_handler)
+            if hasattr(signal, 'SIGHUP'):
+                signal.signal(signal.SIGHUP, self._reload_config)
 
         try:
             server_socket.bind((ip, port))
@@ -117,290 +206,428 @@ class Server:
             sys.exit(1)
 
         server_socket.listen()
+        server_socket.setblocking(False)
+        self._server_socket = server_socket
         logger.debug('Server is up and running')
 
-        threads = []
+        wake_recv, self._wake_send = socket.socketpair()
+        wake_recv.setblocking(False)
+        self._wake_send.setblocking(False)
+        self._wake_recv = wake_recv
 
-        while not self.stop_event.is_set(): 
-            try:
-                server_socket.settimeout(1)
-                conn, addr = server_socket.accept()
+        selector = selectors.DefaultSelector()
+        selector.register(server_socket, selectors.EVENT_READ)
+        selector.register(wake_recv, selectors.EVENT_READ)
+        self._selector = selector
 
-                t = threading.Thread(target=self._handle_client, args=(conn, addr, server_socket))
-                t.start()
-                threads.append(t)
-            except socket.timeout:
-                continue 
-            except KeyboardInterrupt:
-                self._graceful_shutdown()
+        stop_is_set = self.stop_event.is_set
+        select = selector.select
+        handle_client = self._handle_client
+        states = self._states
 
-        for t in threads:
-            t.join()
+        try:
+            while not stop_is_set(): 
+                if self._shutdown_requested:
+                    self._graceful_shutdown()
+                    continue
+
+                try:
+                    events = select()
+                except KeyboardInterrupt:
+                    self._graceful_shutdown()
+                    continue
+
+                for key, mask in events:
+                    if key.fileobj is server_socket:
+                        self._accept(selector, server_socket)
+                        continue
+
+                    if key.fileobj is wake_recv:
+                        try:
+                            wake_recv.recv(RECV_SIZE)
+                        except OSError:
+                            pass
+                        continue
+
+                    conn = key.fileobj
+                    if mask & selectors.EVENT_WRITE:
+                        self._flush(conn, key.data)
+                    if mask & selectors.EVENT_READ and not handle_client(conn, key.data):
+                        selector.unregister(conn)
+                        del states[conn]
+                        conn.close()
+        finally:
+            for conn, state in states.items():
+                if state.out:
+                    self._flush(conn, state)
+            for key in list(selector.get_map().values()):
+                key.fileobj.close()
+            selector.close()
+            self._selector = None
+            self._wake_send.close()
+
+    def _accept(self, selector: selectors.BaseSelector, server_socket: socket.socket) -> None:
+        '''
+        Accepts a pending client connection and registers it on the selector with a fresh per-connection state.
+        - Disables Nagle so small replies are not held back waiting for an ACK
+        - Enables keepalive so dead tracker clients are eventually noticed
+        '''
+
+        try:
+            conn, addr = server_socket.accept()
+        except OSError:
+            return
+
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        conn.setblocking(False)
+        state = _ConnState(addr)
+        self._states[conn] = state
+        selector.register(conn, selectors.EVENT_READ, state)
+
+    def _send(self, conn: socket.socket, payload: bytes) -> None:
+        '''
+        Queues one framed message for a client connection and sends as much of it as the socket accepts right away.
+        - Never blocks the loop: whatever the peer is not reading yet stays in its output buffer until it becomes writable
+        - Messages for connections that are already closed are dropped
+        '''
+
+        state = self._states.get(conn)
+        if state is None:
+            return
 
-        server_socket.close()
+        pending = bool(state.out)
+        state.out += frame_message(payload)
+        if not pending:
+            self._flush(conn, state)
+
+    def _flush(self, conn: socket.socket, state: _ConnState) -> None:
+        '''
+        Sends as much of a connection's queued output as the socket accepts.
+        - Watches the connection for writability only while output remains
+        - On a send error the output is discarded; the read side then sees the failure and closes the connection
+        '''
+
+        out = state.out
+        try:
+            sent = conn.send(out)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            sent = len(out)
+        del out[:sent]
+
+        selector = self._selector
+        events = _READ_WRITE if out else _READ
+        if selector is not None and selector.get_key(conn).events != events:
+            selector.modify(conn, events, state)
+
+    def _reload_config(self, sig=None, frame=None) -> None:
+        '''
+        Re-reads the process limit from the current profile.
+        - Profile commands refuse to run while the server is up, so this is only needed after a manual edit (SIGHUP)
+        '''
+
+        _, _, _, limit = self.profile_manager.get_current_profile()
+        if limit is not None:
+            self._limit = limit
+            logger.debug('Reloaded configuration | Limit: %s', limit)
 
     def _signal_handler(self, sig, frame):
         '''
         Handles SIGTERM/SIGINT signal to ensure proper shutdown.
-        - Calls the graceful shutdown method to stop the server
-        - Exits the program with a success status
+        - The handler interrupts the loop's thread, possibly in the middle of a handler, so it only requests the shutdown
+        '''
+
+        self.request_shutdown()
+
+    def request_shutdown(self) -> None:
+        '''
+        Asks the selector loop to shut the server down.
+        - Only flags the request and wakes the loop, which runs the graceful shutdown itself
+        - Safe to call from a signal handler or another thread (the Windows service stop); all server state stays owned by the loop's thread
+        - A request made before the loop starts is picked up on its first iteration
         '''
 
-        self._graceful_shutdown()
-        sys.exit(0)
+        self._shutdown_requested = True
+        self._wake()
+
+    def _wake(self) -> None:
+        '''
+        Wakes the selector loop by writing a byte to the wakeup socket.
+        - Safe to call from any thread; does nothing once the server has closed it
+        '''
+
+        if self._wake_send is None:
+            return
+        try:
+            self._wake_send.send(b'\0')
+        except OSError:
+            pass
 
     def _graceful_shutdown(self) -> None:
         '''
         Manages the shutdown process:
         - Attempts to stop any running tracked processes by sending a 'stop' signal
         - If processes are still running, sends a stop signal to each process
-        - Sets the stop_event to trigger the server shutdown 
+        - Sets the stop_event and wakes the selector loop to trigger the server shutdown
+        - Runs on the loop's thread like every handler, so no lock guards the server state; other threads use request_shutdown
         '''
 
         tracked_processes = self.tracked_processes
-        lock = self.lock
 
-        with lock:
-            has_running = bool(tracked_processes)
-        
-        if has_running:
-            with lock:
-                processes_copy = list(tracked_processes.values())
-                tracked_processes.clear()  
-            for running_process in processes_copy:
-                process_conn: socket.socket = running_process['conn']
-                try:
-                    process_conn.sendall('stop'.encode('utf-8'))
-                except OSError:
-                    continue
+        if tracked_processes:
+            conns = list(self._conns.values())
+            tracked_processes.clear()  
+            self._conns.clear()
+            self._names_lower.clear()
+            self._ids_lower.clear()
+            self._running = 0
+            self._stopped = 0
+            for process_conn in conns:
+                self._send(process_conn, _STOP_MSG)
         
         logger.debug('Stopping the server')
         self.stop_event.set()
+        self._wake()
     
+    def _count_status(self, status: str, delta: int) -> None:
+        '''
+        Adjusts the running/stopped counters for a process with the given status.
+        - Called by the handlers that add, remove or update a process
+        '''
+
+        if status == 'running':
+            self._running += delta
+        else:
+            self._stopped += delta
+
     def status_handler(self, conn: socket.socket, server_socket: socket.socket):
         '''
         Sends server status to the client.
         - Includes IP, port, number of tracked processes
-        - Counts running and stopped processes
+        - Reads the running and stopped counters kept by the add/rm/update handlers
         '''
 
         tracked_processes = self.tracked_processes
-        lock = self.lock
 
         ip, port = server_socket.getsockname()
 
-        with lock:
-            status_data = {
-                'ip': ip,
-                'port': port,
-                'tracked_processes': len(tracked_processes),
-                'running': 0,
-                'stopped': 0
-            }
-
-            for process_info in tracked_processes.values():
-                status = process_info.get('status')
-                if status == 'running':
-                    status_data['running'] += 1
-                else:
-                    status_data['stopped'] += 1
+        status_data = {
+            'ip': ip,
+            'port': port,
+            'tracked_processes': len(tracked_processes),
+            'running': self._running,
+            'stopped': self._stopped
+        }
 
-        logger.debug(f'Sent server status to client {conn.getpeername()} | Status: {status_data}')
-        conn.send(json.dumps(status_data).encode('utf-8'))
+        logger.debug('Sent server status to client %s | Status: %s', self._states[conn].addr, status_data)
+        self._send(conn, encode_json(status_data))
 
     def add_handler(self, conn: socket.socket, json_data: AddType) -> None:
         '''
         Adds a new process to the tracked_processes dictionary.
-        - Checks maximum tracking limit
+        - Checks maximum tracking limit (cached when the server starts)
         - Checks for duplicate process names or IDs
         - Stores connection socket for future communication
         - Sends acknowledgment or error to client
         '''
 
         tracked_processes = self.tracked_processes
-        lock = self.lock
 
-        _, _, _, limit = self.profile_manager.get_current_profile()
-        if not len(tracked_processes) < limit:
-            logger.debug(f'Client {conn.getpeername()} attempted to add a process but reached limit')
-            conn.send(b'limit')
+        if not len(tracked_processes) < self._limit:
+            logger.debug('Client %s attempted to add a process but reached limit', self._states[conn].addr)
+            self._send(conn, _RESP_LIMIT)
             return
         
-        id = list(json_data.keys())[1] 
-        process = json_data[id]
-
-        with lock:
-            for key, value in tracked_processes.items():
-                if process['process_name'].lower() == value['process_name'].lower():
-                    logger.debug(f'Duplicate process name attempt by client {conn.getpeername()}: {process['process_name']}')
-                    conn.send(b'duplicate process')
-                    return
-                elif key.lower() == id.lower():
-                    logger.debug(f'Duplicate ID attempt by client {conn.getpeername()}: {id}')
-                    conn.send(b'duplicate id')
-                    return
-            
-            tracked_processes[id] = process
-            tracked_processes[id]['conn'] = conn
+        id = json_data['id']
+        process = json_data['process']
+
+        name_lower = process['process_name'].lower()
+        id_lower = id.lower()
+
+        if name_lower in self._names_lower:
+            logger.debug('Duplicate process name attempt by client %s: %s', self._states[conn].addr, process['process_name'])
+            self._send(conn, _RESP_DUPLICATE_PROCESS)
+            return
+        if id_lower in self._ids_lower:
+            logger.debug('Duplicate ID attempt by client %s: %s', self._states[conn].addr, id)
+            self._send(conn, _RESP_DUPLICATE_ID)
+            return
+        
+        tracked_processes[id] = process
+        self._conns[id] = conn
+        self._names_lower[name_lower] = id
+        self._ids_lower[id_lower] = id
+        self._count_status(process.get('status'), 1)
 
-        logger.debug(f'Process added by client {conn.getpeername()} | Process ID: {id}')
-        conn.send(b'ok')
+        logger.debug('Process added by client %s | Process ID: %s', self._states[conn].addr, id)
+        self._send(conn, _RESP_OK)
 
     def rm_handler(self, conn: socket.socket, json_data: RemoveType) -> None:
         '''
         Removes a process from tracking.
+        - Rejects an ID that is missing, empty or not a string before touching the tables
         - Sends stop signal to the process' client
         - Deletes process from tracked_processes
         - Sends acknowledgment or error to client
         '''
 
         tracked_processes = self.tracked_processes
-        lock = self.lock
-
-        with lock:
-            if json_data['process'] in tracked_processes.keys():
-                untracked_process = tracked_processes[json_data['process']]
-                process_conn: socket.socket = untracked_process['conn']
-                del tracked_processes[json_data['process']]
-                logger.debug(f'Process {json_data['process']} removed by client {conn.getpeername()}')
-            else:
-                logger.warning(f'Client {conn.getpeername()} attempted to remove a non-existent process')
-                conn.send(b'error')
-                return
-        try:
-            process_conn.sendall('stop'.encode('utf-8'))
-        except OSError:
-            pass
+
+        id = json_data.get('process')
+        if not _is_track_id(id):
+            logger.warning('Client %s sent an invalid process ID to remove: %r', self._states[conn].addr, id)
+            self._send(conn, _RESP_ERROR)
+            return
+
+        untracked_process = tracked_processes.pop(id, None)
+        if untracked_process is None:
+            logger.warning('Client %s attempted to remove a non-existent process', self._states[conn].addr)
+            self._send(conn, _RESP_ERROR)
+            return
+
+        process_conn = self._conns.pop(id)
+        self._names_lower.pop(untracked_process['process_name'].lower(), None)
+        self._ids_lower.pop(id.lower(), None)
+        self._count_status(untracked_process.get('status'), -1)
+        logger.debug('Process %s removed by client %s', id, self._states[conn].addr)
+        self._send(process_conn, _STOP_MSG)
         
-        conn.send(b'ok')
+        self._send(conn, _RESP_OK)
 
     def ps_handler(self, conn: socket.socket, json_data: PsType) -> None:
         '''
         Sends a list of tracked processes to the client.
         - Supports filters: all vs running only, detailed vs summary view
-        - Excludes certain internal fields if not requested
-        - Handles disconnected clients gracefully
+        - Copies each entry in one step and drops internal fields, instead of rebuilding it key by key
+        - Handles disconnected clients gracefully, using the peer address cached at accept instead of a getpeername call per process
         '''
 
         tracked_processes = self.tracked_processes
-        lock = self.lock
+
+        show_all = json_data['all']
+        detailed = json_data['detailed']
+        hidden = ('track_pid', 'session_time') if detailed else ('track_pid', 'session_time', 'pid')
+        conns = self._conns
+        states = self._states
 
         ps_data = {}
+        now = time.time()
 
-        with lock:
-            for track_id, process_info in tracked_processes.items():
-                if not json_data['all'] and process_info.get('status') == 'stopped':
-                    continue
+        for track_id, process_info in tracked_processes.items():
+            if not show_all and process_info.get('status') == 'stopped':
+                continue
 
-                data = {}
-                for key, value in process_info.items():
-                    if key == 'track_pid' or key == 'session_time':
-                        continue
+            data = process_info.copy()
+            for key in hidden:
+                data.pop(key, None)
 
-                    if not json_data['detailed'] and key in ('pid', 'conn'):
-                        continue
+            if process_info['session_time'] is not None:
+                data['runtime'] = process_info['runtime'] + now - process_info['session_time']
 
-                    if key == 'runtime' and process_info['session_time'] is not None:
-                        data[key] = process_info['runtime'] + time.time() - process_info['session_time']
-                        continue
+            if detailed:
+                state = states.get(conns[track_id])
+                if state is not None:
+                    data['conn'] = state.peer
+                else:
+                    data['conn'] = 'Disconnected'
+                    data['pid'] = '--'
+                    data['runtime'] = '--'
+                    data['status'] = '--'
 
-                    if key == 'conn':
-                        try:
-                            client_host, client_port = value.getpeername()
-                            data[key] = f'{client_host}/{client_port}'
-                        except OSError:
-                            data[key] = f'Disconnected'
-                            data['pid'] = '--'
-                            data['runtime'] = '--'
-                            data['status'] = '--'
-                        continue
-                    
-                    data[key] = value
+            ps_data[track_id] = data
 
-                ps_data[track_id] = data
-        
-        logger.debug(f'Sent process status list to client {conn.getpeername()} | Data: {ps_data}')
-        conn.sendall(json.dumps(ps_data).encode('utf-8'))
+        logger.debug('Sent process status list to client %s | Data: %s', self._states[conn].addr, ps_data)
+        self._send(conn, encode_json(ps_data))
 
     def rename_handler(self, conn: socket.socket, json_data: RenameType) -> None:
         '''
         Renames the tracking ID of a process.
-        - Checks for duplicate new ID
+        - Rejects a current or new ID that is missing, empty or not a string before touching the tables
+        - Checks for duplicate new ID (case-insensitively, like add)
         - Updates tracked_processes dictionary
         - Sends acknowledgment or error to client
         '''
 
         tracked_processes = self.tracked_processes
-        lock = self.lock
 
         id = json_data.get('process')
         new_id = json_data.get('new_id')
+        if not (_is_track_id(id) and _is_track_id(new_id)):
+            logger.warning('Client %s sent an invalid process ID to rename: %r -> %r', self._states[conn].addr, id, new_id)
+            self._send(conn, _RESP_ERROR)
+            return
 
-        with lock:
-            if new_id in tracked_processes.keys():
-                logger.debug(f'Client {conn.getpeername()} attempted to rename process but new ID {new_id} is already in use')
-                conn.send(b'duplicate')
-                return
-            if id in tracked_processes.keys():
-                tracked_processes[new_id] = tracked_processes.pop(id)            
-                logger.debug(f'Process {id} renamed to {new_id} by client {conn.getpeername()}')
-            else:
-                logger.warning(f'Client {conn.getpeername()} attempted to rename a non-existent process: {id}')
-                conn.send(b'error')
-                return
-        
-        conn.send(b'ok')
+        if self._ids_lower.get(new_id.lower(), id) != id:
+            logger.debug('Client %s attempted to rename process but new ID %s is already in use', self._states[conn].addr, new_id)
+            self._send(conn, _RESP_DUPLICATE)
+            return
+
+        process = tracked_processes.pop(id, None)
+        if process is None:
+            logger.warning('Client %s attempted to rename a non-existent process: %s', self._states[conn].addr, id)
+            self._send(conn, _RESP_ERROR)
+            return
+
+        tracked_processes[new_id] = process
+        self._conns[new_id] = self._conns.pop(id)
+        self._ids_lower.pop(id.lower(), None)
+        self._ids_lower[new_id.lower()] = new_id
+        self._names_lower[process['process_name'].lower()] = new_id
+        logger.debug('Process %s renamed to %s by client %s', id, new_id, self._states[conn].addr)
+
+        self._send(conn, _RESP_OK)
 
     def report_handler(self, conn: socket.socket) -> None:
         '''
         Handles the generation of a report containing the list of active processes.
-        - Check the status of each tracked process 
+        - Check the status of each tracked process and whether its client is still connected
         - Sends the names to the client
         '''
         
         tracked_processes = self.tracked_processes
-        lock = self.lock
 
         data = {'active_processes': []}
 
-        with lock:
-            for process_info in tracked_processes.values():
-                if process_info['status'] == 'running':
-                    try:
-                        process_info['conn'].getpeername()
-                    except OSError:
-                        continue
+        for track_id, process_info in tracked_processes.items():
+            if process_info['status'] == 'running':
+                if self._conns[track_id] not in self._states:
+                    continue
 
-                    data['active_processes'].append(process_info['process_name'])
+                data['active_processes'].append(process_info['process_name'])
 
-        logger.debug(f'Generated report for active processes: {data['active_processes']}')
-        conn.sendall(json.dumps(data).encode('utf-8'))
+        logger.debug('Generated report for active processes: %s', data['active_processes'])
+        self._send(conn, encode_json(data))
 
     def update_handler(self, json_data: UpdateType) -> None:
         '''
         Updates the status and PID of a tracked process.
-        - Finds the process by name
+        - Finds the process through the lowercased name index
         - Updates its "status", "pid", "session_time", and "runtime" fields in tracked_processes
         '''
 
         tracked_processes = self.tracked_processes
-        lock = self.lock
 
         status = json_data['status']
-        process_name = list(json_data.keys())[2] 
-        pid = json_data[process_name]
+        process_name = json_data['process_name']
+        pid = json_data['pid']
         session_time = json_data['session_time']
+        now = time.time()
+
+        id = self._names_lower.get(process_name.lower())
+        if id is None:
+            logger.warning('Client attempted to update non-existent process: %s', process_name)
+            return
 
-        with lock:
-            for process in tracked_processes.values():
-                if process['process_name'] == process_name:
-                    process['status'] = status
-                    process['pid'] = pid
+        process = tracked_processes[id]
+        self._count_status(process.get('status'), -1)
+        self._count_status(status, 1)
+        process['status'] = status
+        process['pid'] = pid
 
-                    if session_time is None and process['session_time'] is not None: 
-                        process['runtime'] += time.time() - process['session_time']
-                    process['session_time'] = session_time
+        if session_time is None and process['session_time'] is not None: 
+            process['runtime'] += now - process['session_time']
+        process['session_time'] = session_time
 
-                    logger.debug(f'Updated process {process_name} | Status: {status}, PID: {pid}, Session Time: {session_time}')
-                    return
-            logger.warning(f'Client attempted to update non-existent process: {process_name}')
\ No newline at end of file
+        logger.debug('Updated process %s | Status: %s, PID: %s, Session Time: %s', process_name, status, pid, session_time)
\ No newline at end of file
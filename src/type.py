@@ -1,20 +1,21 @@
-from typing import Dict, List, Optional, TypedDict, Union
-from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, TypedDict
 
-class ProfileType(TypedDict):
+class ProfileType(NamedTuple):
     username: str
     ip: str
     port: int
     limit: int
     selected: int
 
-class LogInfo(TypedDict):
-    start_time: datetime
-    end_time: datetime
+class LogInfo(NamedTuple):
+    start_time: str
+    end_time: str
 LogType = Dict[str, List[LogInfo]]
 
 class CommandType(TypedDict):
     command: str
+ReportType = CommandType
+StatusType = CommandType
 
 class ProcessInfo(TypedDict):
     process_name: str
@@ -24,27 +25,24 @@ class ProcessInfo(TypedDict):
     session_time: float
     runtime: float
     status: str
-    conn: Optional[object]
-AddType = Union[CommandType, Dict[str, ProcessInfo]]
 
-class RemoveType(TypedDict, CommandType):
+class AddType(CommandType):
+    id: str
+    process: ProcessInfo
+
+class RemoveType(CommandType):
     process: str
 
-class RenameType(TypedDict, CommandType):
+class RenameType(CommandType):
     process: str
     new_id: str
 
-class ReportType(TypedDict, CommandType):
-    pass
-
-class StatusType(TypedDict, CommandType):
-    pass
-
-class PsType(TypedDict, CommandType):
+class PsType(CommandType):
     all: bool
     detailed: bool
 
-class UpdateInfo(TypedDict, CommandType):
+class UpdateType(CommandType):
     status: str
-    session_time: float
-UpdateType = Union[UpdateInfo, Dict[str, int]]
\ No newline at end of file
+    process_name: str
+    pid: Optional[int]
+    session_time: float
\ No newline at end of file
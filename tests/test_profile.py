@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+# TRAKD_DIR is resolved from HOME at import, so each scenario runs in its own interpreter.
+_SCRIPT = '''
+import os, sys
+sys.path.insert(0, {src!r})
+from manager.profile import ProfileManager
+
+pm = ProfileManager()
+logs = os.path.expanduser('~/.trakd/logs')
+
+assert pm.create_profile('  bob  ')
+assert os.listdir(logs) == ['bob'], os.listdir(logs)
+
+assert pm.rename_profile(' bob ', ' carol ')
+assert [p.username for p in pm.get_profiles()] == ['carol']
+assert os.listdir(logs) == ['carol'], os.listdir(logs)
+
+assert pm.remove_profile(' carol ')
+assert os.listdir(logs) == [], os.listdir(logs)
+'''
+
+class ProfileManagerTest(unittest.TestCase):
+    def test_padded_username_logs_dir_matches_profile(self):
+        with tempfile.TemporaryDirectory() as home:
+            result = subprocess.run(
+                [sys.executable, '-c', _SCRIPT.format(src=SRC_DIR)],
+                env=dict(os.environ, HOME=home), capture_output=True, text=True
+            )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import socket
+import sys
+import unittest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+sys.path.insert(0, SRC_DIR)
+
+import protocol
+from protocol import MAX_FRAME_SIZE, ProtocolError, frame_message, recv_message, send_message, split_messages
+
+class _PartialSocket:
+    '''
+    Records sendall calls and lets sendmsg accept only the first few bytes.
+    '''
+
+    def __init__(self, accepted: int):
+        self.accepted = accepted
+        self.data = bytearray()
+
+    def sendmsg(self, buffers):
+        data = b''.join(buffers)[:self.accepted]
+        self.data += data
+        return len(data)
+
+    def sendall(self, data):
+        self.data += data
+
+class SplitMessagesTest(unittest.TestCase):
+    def test_header_split_across_reads(self):
+        frame = frame_message(b'{"command":"status"}')
+        buffer = bytearray(frame[:2])
+
+        self.assertEqual(split_messages(buffer), [])
+        self.assertEqual(buffer, frame[:2])
+
+        buffer += frame[2:]
+        self.assertEqual(split_messages(buffer), [b'{"command":"status"}'])
+        self.assertEqual(buffer, b'')
+
+    def test_several_frames_in_one_read(self):
+        payloads = [b'ping', b'', b'{"command":"ps"}']
+        tail = frame_message(b'partial')[:6]
+        buffer = bytearray(b''.join(frame_message(p) for p in payloads) + tail)
+
+        self.assertEqual(split_messages(buffer), payloads)
+        self.assertEqual(buffer, tail)
+
+    def test_oversized_frame_is_rejected(self):
+        # An unframed peer sending JSON makes '{"co' the length header, about 2 GB.
+        buffer = bytearray(b'{"command":"status"}')
+
+        with self.assertRaises(ProtocolError):
+            split_messages(buffer)
+
+    def test_frame_at_limit_is_accepted(self):
+        buffer = bytearray(MAX_FRAME_SIZE.to_bytes(4, 'big'))
+        self.assertEqual(split_messages(buffer), [])
+
+class SocketFramingTest(unittest.TestCase):
+    def setUp(self):
+        self.left, self.right = socket.socketpair()
+        self.addCleanup(self.left.close)
+        self.addCleanup(self.right.close)
+
+    def test_round_trip(self):
+        send_message(self.left, b'hello')
+        self.assertEqual(recv_message(self.right), b'hello')
+
+    def test_recv_returns_none_on_close(self):
+        self.left.sendall(b'\x00\x00')
+        self.left.close()
+        self.assertIsNone(recv_message(self.right))
+
+    def test_recv_rejects_oversized_frame(self):
+        self.left.sendall(b'{"command":"status"}')
+        with self.assertRaises(ProtocolError):
+            recv_message(self.right)
+
+    def test_protocol_error_is_a_connection_error(self):
+        self.assertTrue(issubclass(ProtocolError, OSError))
+
+@unittest.skipUnless(protocol._HAS_SENDMSG, 'sendmsg is unavailable')
+class SendMessageFallbackTest(unittest.TestCase):
+    def test_partial_sendmsg_inside_header(self):
+        sock = _PartialSocket(accepted=2)
+        send_message(sock, b'payload')
+        self.assertEqual(bytes(sock.data), frame_message(b'payload'))
+
+    def test_partial_sendmsg_inside_payload(self):
+        sock = _PartialSocket(accepted=6)
+        send_message(sock, b'payload')
+        self.assertEqual(bytes(sock.data), frame_message(b'payload'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+sys.path.insert(0, SRC_DIR)
+
+from protocol import recv_message, send_message
+
+MAIN = os.path.join(SRC_DIR, 'main.py')
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+class ServerCommandTest(unittest.TestCase):
+    '''
+    Runs a real server in a throwaway HOME and talks to it over the wire protocol.
+    '''
+
+    def setUp(self):
+        self.home = tempfile.TemporaryDirectory()
+        self.env = dict(os.environ, HOME=self.home.name)
+        self.port = _free_port()
+
+        self._trakd('user', 'add', 'alice', '-s')
+        self._trakd('config', 'set', '-p', str(self.port))
+
+        self.server = subprocess.Popen(
+            [sys.executable, MAIN, 'server', 'run'],
+            env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        self._wait_until_up()
+
+    def tearDown(self):
+        if self.server.poll() is None:
+            try:
+                self._send({'command': 'stop'}, wait_for_response=False)
+            except OSError:
+                pass
+            try:
+                self.server.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.server.kill()
+                self.server.wait()
+        self.home.cleanup()
+
+    def _trakd(self, *args: str) -> None:
+        subprocess.run([sys.executable, MAIN, *args], env=self.env, check=True, capture_output=True)
+
+    def _connect(self) -> socket.socket:
+        return socket.create_connection(('127.0.0.1', self.port), timeout=5)
+
+    def _wait_until_up(self) -> None:
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            try:
+                self._connect().close()
+                return
+            except OSError:
+                time.sleep(0.05)
+        self.fail('Server did not start')
+
+    def _send(self, data: dict, wait_for_response: bool = True):
+        with self._connect() as sock:
+            send_message(sock, json.dumps(data).encode('utf-8'))
+            if wait_for_response:
+                return recv_message(sock)
+
+    def test_non_string_command_is_ignored(self):
+        with self._connect() as sock:
+            for command in ({'a': 1}, [1], 5, None):
+                send_message(sock, json.dumps({'command': command}).encode('utf-8'))
+
+            sock.settimeout(0.5)
+            with self.assertRaises(socket.timeout):
+                sock.recv(1)
+
+        self.assertIsNone(self.server.poll())
+
+        status = json.loads(self._send({'command': 'status'}))
+        self.assertEqual(status['port'], self.port)
+        self.assertEqual(status['tracked_processes'], 0)
+
+    def test_valid_command_after_bad_ones_in_one_read(self):
+        frames = b''.join(
+            len(payload).to_bytes(4, 'big') + payload
+            for payload in (
+                json.dumps({'command': {'a': 1}}).encode('utf-8'),
+                json.dumps({'command': [1]}).encode('utf-8'),
+                json.dumps({'command': 'status'}).encode('utf-8'),
+            )
+        )
+
+        with self._connect() as sock:
+            sock.sendall(frames)
+            status = json.loads(recv_message(sock))
+
+        self.assertEqual(status['port'], self.port)
+        self.assertIsNone(self.server.poll())
+
+    def test_invalid_ids_are_rejected(self):
+        requests = (
+            {'command': 'rename', 'process': 'zzz'},
+            {'command': 'rename', 'process': 'zzz', 'new_id': 5},
+            {'command': 'rename', 'process': None, 'new_id': 'yyy'},
+            {'command': 'rename', 'process': 'zzz', 'new_id': ''},
+            {'command': 'rm'},
+            {'command': 'rm', 'process': ['zzz']},
+            {'command': 'rm', 'process': ''},
+        )
+
+        for request in requests:
+            with self.subTest(request=request):
+                self.assertEqual(self._send(request), b'error')
+
+        self.assertIsNone(self.server.poll())
+
+    def test_unframed_peer_is_dropped(self):
+        with self._connect() as sock:
+            sock.sendall(json.dumps({'command': 'status'}).encode('utf-8'))
+            self.assertEqual(sock.recv(1), b'')
+
+        status = json.loads(self._send({'command': 'status'}))
+        self.assertEqual(status['port'], self.port)
+
+    def test_peer_not_reading_does_not_stall_others(self):
+        request = json.dumps({'command': 'status'}).encode('utf-8')
+        frame = len(request).to_bytes(4, 'big') + request
+        # Far more replies than the socket buffers hold, so the server has to queue them.
+        flood = frame * 200000
+
+        stalled = self._connect()
+        stalled.settimeout(None)
+        self.addCleanup(stalled.close)
+
+        def send_flood():
+            try:
+                stalled.sendall(flood)
+            except OSError:
+                pass
+
+        threading.Thread(target=send_flood, daemon=True).start()
+
+        deadline = time.monotonic() + 4
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            status = json.loads(self._send({'command': 'status'}))
+            self.assertEqual(status['port'], self.port)
+            self.assertLess(time.monotonic() - started, 1)
+            time.sleep(0.1)
+
+if __name__ == '__main__':
+    unittest.main()